@@ -1,8 +1,16 @@
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime
+from collections import Counter
+import hmac
+import json
 import os
 
+from roots.databases.connections import get_async_redis
+from trunk.runtime.profiling import (
+    CONFIG_KEY, CONTROL_CHANNEL, REPORTS_KEY, STACKS_KEY, parse_modes
+)
+
 app = FastAPI(
     title="Tree of Life Core",
     version="1.0.0",
@@ -18,6 +26,7 @@ async def root():
         "endpoints": {
             "health": "/health",
             "webhook": "/webhooks/linear",
+            "profiling": "/admin/profiling",
             "docs": "/docs",
             "redoc": "/redoc"
         },
@@ -105,3 +114,73 @@ async def system_status():
             "branches": "Business Logic (Verification, DAO, Marketing, Wealth)"
         }
     }
+
+def require_admin(request: Request):
+    """Admin endpoints stay closed unless ADMIN_TOKEN is configured"""
+    token = os.getenv("ADMIN_TOKEN")
+    supplied = request.headers.get("x-admin-token", "")
+    if not token or not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/admin/profiling")
+async def profiling_status(request: Request):
+    """
+    Current profiling switch and the latest report from every process
+    """
+    require_admin(request)
+    redis = get_async_redis()
+    config = await redis.get(CONFIG_KEY)
+    reports = await redis.hgetall(REPORTS_KEY)
+    return {
+        "config": json.loads(config) if config else {"modes": parse_modes(os.getenv("TREE_PROFILING", ""))},
+        "processes": [json.loads(report) for report in reports.values()]
+    }
+
+@app.post("/admin/profiling")
+async def profiling_configure(request: Request):
+    """
+    Switch profiling for every running process, e.g.
+    {"modes": ["timing", "stacks", "alloc"], "sample_interval": 0.01, "reset": false}.
+    An empty modes list turns it off.
+    """
+    require_admin(request)
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Body must be a JSON object")
+    modes = payload.get("modes", [])
+    if not isinstance(modes, (str, list)):
+        raise HTTPException(status_code=400, detail="modes must be a list or comma-separated string")
+    config = {"modes": parse_modes(modes)}
+    if payload.get("sample_interval"):
+        try:
+            sample_interval = float(payload["sample_interval"])
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="sample_interval must be a number")
+        if not 0 < sample_interval < 60:
+            raise HTTPException(status_code=400, detail="sample_interval must be between 0 and 60 seconds")
+        config["sample_interval"] = sample_interval
+
+    redis = get_async_redis()
+    # Stored for processes that start later, published for the live ones
+    await redis.set(CONFIG_KEY, json.dumps(config))
+    if payload.get("reset"):
+        await redis.delete(REPORTS_KEY, STACKS_KEY)
+    receivers = await redis.publish(CONTROL_CHANNEL, json.dumps(dict(config, reset=bool(payload.get("reset")))))
+    return {"config": config, "processes_notified": receivers}
+
+@app.get("/admin/profiling/stacks", response_class=PlainTextResponse)
+async def profiling_stacks(request: Request):
+    """
+    Sampled stacks from all processes in collapsed format, ready for
+    flamegraph.pl or speedscope
+    """
+    require_admin(request)
+    stacks = Counter()
+    for collapsed in (await get_async_redis().hgetall(STACKS_KEY)).values():
+        for line in collapsed.splitlines():
+            stack, _, count = line.rpartition(" ")
+            stacks[stack] += int(count)
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
@@ -3,21 +3,25 @@ GOVERNANCE BRANCH
 Manages DAO state, voting, and token economics
 """
 import json
-import redis
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from roots.databases.connections import get_pubsub, get_redis
+from roots.databases.dedup import Deduplicator
+from roots.databases.streams import RESULTS
+from trunk.runtime.profiling import attach as attach_profiler
+
 load_dotenv()
 
 class GovernanceAgent:
+    channel = 'branch:governance:task'
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
-        self.pubsub = self.redis.pubsub()
-        self.pubsub.subscribe('branch:governance:task')
+        self.redis = get_redis()
+        self.dedup = Deduplicator('branch:governance', client=self.redis, exclusive=False)
+        attach_profiler(self)
         
     def update_dao_state(self, data):
         """Update DAO state based on blockchain events"""
@@ -42,20 +46,30 @@ class GovernanceAgent:
         
         return summary
     
+    def handle_task(self, task):
+        """Run a single governance task and report back to the context stream"""
+        with self.dedup.claimed(task.get('event_id')) as fresh:
+            if not fresh:
+                print(f"♻️ Duplicate task skipped: {task.get('event_id')}")
+                return None
+            
+            if task['task'] == 'update_dao_state':
+                result = self.update_dao_state(task['data'])
+                self.redis.xadd(RESULTS, {
+                    'source': 'governance_branch',
+                    'event_id': task.get('event_id') or '',
+                    'result': json.dumps(result)
+                })
+                return result
+    
     def listen(self):
         """Listen for governance tasks"""
         print("🌿 Governance Branch: Listening for tasks...")
         
-        for message in self.pubsub.listen():
+        pubsub = get_pubsub(self.channel)
+        for message in pubsub.listen():
             if message['type'] == 'message':
-                task = json.loads(message['data'])
-                
-                if task['task'] == 'update_dao_state':
-                    result = self.update_dao_state(task['data'])
-                    self.redis.xadd('context-stream', {
-                        'source': 'governance_branch',
-                        'result': json.dumps(result)
-                    })
+                self.handle_task(json.loads(message['data']))
 
 if __name__ == "__main__":
     agent = GovernanceAgent()
@@ -0,0 +1,168 @@
+"""
+PII SCRUBBING ENGINE
+Strips identifying information from contribution payloads before they
+reach public marketing channels
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Numeric fields that carry monetary amounts and get bucketed into ranges
+AMOUNT_KEYS = frozenset({'amount', 'reward', 'value', 'price', 'balance', 'payout'})
+
+# (upper bound, label) - first bucket whose bound exceeds the amount wins.
+# Labels are in whole units; bucket_amount adds the unit so a token amount
+# is never published as dollars.
+AMOUNT_BUCKETS: List[Tuple[float, str]] = [
+    (1, '<1'),
+    (10, '1-10'),
+    (100, '10-100'),
+    (1_000, '100-1K'),
+    (10_000, '1K-10K'),
+    (100_000, '10K-100K'),
+    (float('inf'), '100K+'),
+]
+
+# Bare numbers under AMOUNT_KEYS come from contract events: integers are
+# base units (wei-style) of the protocol token, floats whole tokens
+TOKEN_SYMBOL = os.getenv('ANONYMIZE_TOKEN_SYMBOL', 'NWU')
+TOKEN_DECIMALS = int(os.getenv('ANONYMIZE_TOKEN_DECIMALS', 18))
+
+_NON_NUMERIC = re.compile(r'[^\d.]')
+_UNIT = re.compile(r'[A-Za-z]+$')
+
+REDACTED = {
+    'tx_hash': '[TX_HASH]',
+    'wallet': '[WALLET]',
+    'email': '[EMAIL]',
+    'name': '[NAME]',
+}
+
+
+def bucket_amount(amount: float, unit: str = 'USD') -> str:
+    """Map an amount in whole ``unit``s onto its coarse display range"""
+    amount = abs(amount)
+    # NaN and infinity compare below no bound and land in the top bucket
+    label = next((label for bound, label in AMOUNT_BUCKETS if amount < bound), AMOUNT_BUCKETS[-1][1])
+    if unit == 'USD':
+        # '<1' -> '<$1', '10-100' -> '$10-$100', '100K+' -> '$100K+'
+        return re.sub(r'(\d[\dK]*)', r'$\1', label)
+    return f"{label} {unit}"
+
+
+def bucket_token_amount(amount) -> str:
+    """Bucket a bare on-chain amount in the protocol token's own unit"""
+    if isinstance(amount, str):
+        # Large uint256 values often travel as digit strings
+        amount = amount.strip()
+        amount = int(amount) if amount.isdigit() else float(amount)
+    if isinstance(amount, int):
+        amount = amount / 10 ** TOKEN_DECIMALS
+    return bucket_amount(amount, TOKEN_SYMBOL)
+
+
+class PIIScrubber:
+    """
+    All detectors are compiled once into a single alternation so every
+    string is scanned exactly once, whichever detectors fire. Payloads are
+    walked copy-on-write: containers without any redaction are returned
+    as-is, only the path down to a changed leaf is rebuilt.
+    """
+
+    def __init__(self, name_denylist: Optional[Iterable[str]] = None):
+        if name_denylist is None:
+            name_denylist = os.getenv('ANONYMIZE_NAME_DENYLIST', '').split(',')
+        names = sorted({n.strip() for n in name_denylist if n.strip()}, key=len, reverse=True)
+
+        # Every detector except dollar amounts starts on a word boundary, so
+        # the boundary is hoisted out of the alternation: sre then rejects
+        # mid-word positions with a single check instead of one per detector.
+        # Longest hex form comes first so the scan never settles on a prefix.
+        bounded = [
+            r'(?P<tx_hash>0x[0-9a-fA-F]{64}\b)',
+            r'(?P<wallet>0x[0-9a-fA-F]{40}\b)',
+            r'(?P<email>[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b)',
+            r'(?P<amount>\d[\d,]*(?:\.\d+)?\s?(?i:ETH|NWU|USDC|USD)\b)',
+        ]
+        if names:
+            alternation = '|'.join(re.escape(n) for n in names)
+            bounded.append(rf'(?P<name>(?i:{alternation})\b)')
+
+        self.pattern = re.compile(
+            r'\b(?:' + '|'.join(bounded) + r')|(?P<dollars>\$\s?\d[\d,]*(?:\.\d+)?)'
+        )
+
+    def _replace(self, match):
+        kind = match.lastgroup
+        if kind in ('amount', 'dollars'):
+            text = match.group()
+            unit = 'USD' if kind == 'dollars' else _UNIT.search(text).group().upper()
+            try:
+                return bucket_amount(float(_NON_NUMERIC.sub('', text)), unit)
+            except ValueError:
+                return text
+        return REDACTED[kind]
+
+    def scrub_text(self, text: str) -> str:
+        """Redact a single string; returns the same object if nothing matched"""
+        scrubbed, count = self.pattern.subn(self._replace, text)
+        return scrubbed if count else text
+
+    def scrub(self, payload, key=None):
+        """Scrub a nested payload of dicts, lists, tuples and scalars"""
+        if isinstance(payload, str):
+            if isinstance(key, str) and key.lower() in AMOUNT_KEYS:
+                try:
+                    return bucket_token_amount(payload)
+                except ValueError:
+                    pass
+            return self.scrub_text(payload)
+
+        if isinstance(payload, dict):
+            changed = None
+            for k, v in payload.items():
+                new = self.scrub(v, k)
+                if new is not v:
+                    if changed is None:
+                        changed = {}
+                    changed[k] = new
+            if changed is None:
+                return payload
+            return {k: changed[k] if k in changed else v for k, v in payload.items()}
+
+        if isinstance(payload, (list, tuple)):
+            items = None
+            for i, v in enumerate(payload):
+                new = self.scrub(v, key)
+                if new is not v and items is None:
+                    items = list(payload[:i])
+                if items is not None:
+                    items.append(new)
+            if items is None:
+                return payload
+            return type(payload)(items) if isinstance(payload, tuple) else items
+
+        if (
+            isinstance(payload, (int, float))
+            and not isinstance(payload, bool)
+            and isinstance(key, str)
+            and key.lower() in AMOUNT_KEYS
+        ):
+            return bucket_token_amount(payload)
+
+        return payload
+
+
+_default_scrubber: Optional[PIIScrubber] = None
+
+
+def get_scrubber() -> PIIScrubber:
+    """Process-wide scrubber, compiled on first use"""
+    global _default_scrubber
+    if _default_scrubber is None:
+        _default_scrubber = PIIScrubber()
+    return _default_scrubber
+
+
+def anonymize(payload: Dict) -> Dict:
+    return get_scrubber().scrub(payload)
@@ -3,21 +3,27 @@ MARKETING BRANCH
 Automated content creation and social media posting
 """
 import json
-import redis
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from branches.marketing.anonymizer import get_scrubber
+from roots.databases.connections import get_pubsub, get_redis
+from roots.databases.dedup import Deduplicator
+from roots.databases.streams import RESULTS
+from trunk.runtime.profiling import attach as attach_profiler
+
 load_dotenv()
 
 class MarketingAgent:
+    channel = 'branch:marketing:task'
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
-        self.pubsub = self.redis.pubsub()
-        self.pubsub.subscribe('branch:marketing:task')
+        self.redis = get_redis()
+        self.dedup = Deduplicator('branch:marketing', client=self.redis, exclusive=False)
+        attach_profiler(self)
+        self.scrubber = get_scrubber()
         
     def create_success_story(self, data):
         """Generate success story from verified contribution"""
@@ -38,8 +44,15 @@ class MarketingAgent:
         return post_result
     
     def anonymize_data(self, data):
-        # Remove identifying information
-        return {'amount': '$100+', 'type': 'data_contribution'}
+        # Remove identifying information (wallets, tx hashes, emails,
+        # denylisted names) and bucket amounts into display ranges
+        scrubbed = self.scrubber.scrub(data)
+        args = scrubbed.get('args') or {}
+        return {
+            'amount': args.get('amount', '$100+'),
+            'type': 'data_contribution',
+            'payload': scrubbed
+        }
     
     def generate_graphic(self, data):
         # TODO: Use AI image generation
@@ -54,20 +67,30 @@ class MarketingAgent:
         print(f"✅ Posted: {caption}")
         return {'status': 'posted'}
     
+    def handle_task(self, task):
+        """Run a single marketing task and report back to the context stream"""
+        with self.dedup.claimed(task.get('event_id')) as fresh:
+            if not fresh:
+                print(f"♻️ Duplicate task skipped: {task.get('event_id')}")
+                return None
+            
+            if task['task'] == 'create_success_story':
+                result = self.create_success_story(task['data'])
+                self.redis.xadd(RESULTS, {
+                    'source': 'marketing_branch',
+                    'event_id': task.get('event_id') or '',
+                    'result': json.dumps(result)
+                })
+                return result
+    
     def listen(self):
         """Listen for marketing tasks"""
         print("🌿 Marketing Branch: Listening for tasks...")
         
-        for message in self.pubsub.listen():
+        pubsub = get_pubsub(self.channel)
+        for message in pubsub.listen():
             if message['type'] == 'message':
-                task = json.loads(message['data'])
-                
-                if task['task'] == 'create_success_story':
-                    result = self.create_success_story(task['data'])
-                    self.redis.xadd('context-stream', {
-                        'source': 'marketing_branch',
-                        'result': json.dumps(result)
-                    })
+                self.handle_task(json.loads(message['data']))
 
 if __name__ == "__main__":
     agent = MarketingAgent()
@@ -0,0 +1,93 @@
+"""
+CONTRIBUTION CONTENT CHECKS
+Streaming hashing and format validation for contributed datasets.
+Kept free of Redis and agent state so process-pool workers import it
+cheaply.
+"""
+import csv
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+CHUNK_SIZE = int(os.getenv('VERIFY_CHUNK_SIZE', 1 << 20))
+
+# Local contributions must live under this directory; unset, none are read
+DATA_ROOT = os.getenv('VERIFY_DATA_ROOT', '')
+
+
+def content_path(metadata: Dict) -> Optional[str]:
+    """
+    Local path of the contributed file, if the metadata points at one.
+    The URI comes from whoever submitted the contribution, so anything that
+    does not resolve to a regular file under DATA_ROOT raises ValueError
+    before a single byte is read.
+    """
+    uri = metadata.get('path') or metadata.get('uri')
+    if not uri:
+        return None
+    parsed = urlparse(uri)
+    if parsed.scheme not in ('', 'file'):
+        # TODO: stream remote (ipfs://, https://) content through the hasher
+        return None
+    if not DATA_ROOT:
+        raise ValueError('local contributions are disabled (VERIFY_DATA_ROOT unset)')
+
+    root = os.path.realpath(DATA_ROOT)
+    path = os.path.realpath(os.path.join(root, parsed.path if parsed.scheme else uri))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError(f"{uri} is outside the contribution data root")
+    if not os.path.isfile(path):
+        raise ValueError(f"{uri} is not a regular file")
+    return path
+
+
+def hash_content(metadata: Dict) -> str:
+    """SHA-256 of the contribution, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    path = content_path(metadata)
+    if path is None:
+        digest.update(json.dumps(metadata, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def validate_content(metadata: Dict) -> bool:
+    """Check structure line by line so memory stays flat for any file size"""
+    path = content_path(metadata)
+    if path is None:
+        # Nothing to inspect beyond the metadata itself
+        return True
+    if os.path.getsize(path) == 0:
+        return False
+
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        try:
+            if extension == '.csv':
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header:
+                    return False
+                return all(len(row) == len(header) for row in reader if row)
+            if extension in ('.jsonl', '.ndjson'):
+                for line in f:
+                    if line.strip():
+                        json.loads(line)
+                return True
+        except (UnicodeDecodeError, csv.Error, ValueError):
+            return False
+    return True
+
+
+def inspect_contribution(metadata: Dict) -> Tuple[str, bool]:
+    """Process-pool entry point: (content hash, format valid)"""
+    try:
+        return hash_content(metadata), validate_content(metadata)
+    except (OSError, ValueError):
+        return '', False
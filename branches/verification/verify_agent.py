@@ -2,36 +2,55 @@
 VERIFICATION BRANCH
 Validates data contributions and mints NFTs
 """
+import asyncio
 import json
-import redis
+import multiprocessing
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from roots.databases.connections import get_pubsub, get_redis
+from roots.databases.dedup import Deduplicator
+from roots.databases.streams import RESULTS
+from trunk.runtime.profiling import attach as attach_profiler
+from branches.verification.content import hash_content, inspect_contribution, validate_content
+
 load_dotenv()
 
+# Content hash -> id of the contribution that first submitted it
+CONTENT_OWNERS = 'verification:content_owners'
+
 class VerificationAgent:
+    channel = 'branch:verification:task'
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
-        self.pubsub = self.redis.pubsub()
-        self.pubsub.subscribe('branch:verification:task')
+        self.redis = get_redis()
+        self.dedup = Deduplicator('branch:verification', client=self.redis, exclusive=False)
+        attach_profiler(self)
+        
+        self.batch_size = int(os.getenv('VERIFY_BATCH_SIZE', 32))
+        self.batch_window = float(os.getenv('VERIFY_BATCH_WINDOW', 0.05))
+        self.fetch_concurrency = int(os.getenv('VERIFY_FETCH_CONCURRENCY', 16))
+        self.workers = int(os.getenv('VERIFY_WORKERS', 0)) or os.cpu_count() or 1
+        self.pool = None
         
     def verify_contribution(self, contribution_id, data):
         """Main verification logic"""
         print(f"🔍 Verifying contribution: {contribution_id}")
         
         # Step 1: Fetch metadata
-        metadata = self.fetch_metadata(contribution_id)
-        
-        # Step 2: Check for duplicates
-        is_unique = self.check_duplicates(metadata)
+        metadata = self.fetch_metadata(contribution_id, data)
         
-        # Step 3: Validate format
+        # Step 2: Validate format
         is_valid = self.validate_format(metadata)
         
+        # Step 3: Check for duplicates; only well-formed content is recorded
+        is_unique = is_valid and self.check_duplicates(metadata)
+        
         if is_unique and is_valid:
             print("✅ Contribution verified!")
             # Step 4: Trigger NFT minting (handled by smart contract)
@@ -40,36 +59,180 @@ class VerificationAgent:
             print("❌ Verification failed")
             return {'status': 'rejected', 'contribution_id': contribution_id}
     
-    def fetch_metadata(self, contribution_id):
+    def fetch_metadata(self, contribution_id, data=None):
         # TODO: Implement actual metadata fetching
-        return {'id': contribution_id, 'type': 'dataset'}
+        metadata = {'id': contribution_id, 'type': 'dataset'}
+        uri = ((data or {}).get('args') or {}).get('uri')
+        if uri:
+            metadata['uri'] = uri
+        return metadata
     
-    def check_duplicates(self, metadata):
-        # TODO: Check vector database for similar contributions
-        return True
+    def check_duplicates(self, metadata, content_hash=None):
+        # Exact content match; TODO: also check vector database for
+        # near-duplicates
+        content_hash = content_hash or hash_content(metadata)
+        return self.claim_content([(content_hash, metadata['id'])])[0]
+    
+    def claim_content(self, claims):
+        """
+        Record (content hash, contribution id) pairs in one round trip.
+        True where the contribution owns its content: it was first to
+        submit it, or is being verified again.
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        for content_hash, contribution_id in claims:
+            pipe.hsetnx(CONTENT_OWNERS, content_hash, str(contribution_id))
+            pipe.hget(CONTENT_OWNERS, content_hash)
+        owners = pipe.execute()[1::2]
+        return [owner == str(contribution_id) for (_, contribution_id), owner in zip(claims, owners)]
     
     def validate_format(self, metadata):
-        # TODO: Validate data format and structure
-        return True
+        try:
+            return validate_content(metadata)
+        except (OSError, ValueError):
+            return False
+    
+    def get_pool(self):
+        """Process pool for hashing and validation, started on first batch"""
+        if self.pool is None:
+            # Spawned rather than forked: the agent may be hosted next to
+            # event-loop and worker threads, which fork does not copy safely
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self.pool
+    
+    def inspect_all(self, metadatas):
+        """Hash and validate on the pool, replacing it once if a worker died"""
+        try:
+            return list(self.get_pool().map(inspect_contribution, metadatas))
+        except BrokenProcessPool:
+            # A killed worker (OOM, signal) breaks the pool for good
+            print("⚠️ Verification pool broken, restarting it")
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+            return list(self.get_pool().map(inspect_contribution, metadatas))
+    
+    async def fetch_all_metadata(self, contributions):
+        """Fetch metadata for a batch concurrently, bounded by a semaphore"""
+        semaphore = asyncio.Semaphore(self.fetch_concurrency)
+        
+        async def fetch(contribution_id, data):
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_metadata, contribution_id, data)
+        
+        return await asyncio.gather(*(fetch(cid, data) for cid, data in contributions))
+    
+    def verify_batch(self, contributions):
+        """Verify a micro-batch of (contribution_id, data) pairs"""
+        started = time.perf_counter()
+        print(f"🔍 Verifying batch of {len(contributions)} contributions")
+        
+        # Step 1: Fetch metadata concurrently
+        metadatas = asyncio.run(self.fetch_all_metadata(contributions))
+        
+        # Step 2+3: Hash and validate on every core, files streamed in chunks
+        inspected = self.inspect_all(metadatas)
+        
+        # Duplicates within the batch and against everything accepted before,
+        # settled in one round trip. Only well-formed content is recorded so
+        # a rejected upload can be fixed and resubmitted.
+        valid = [
+            (content_hash, contribution_id)
+            for (contribution_id, _), (content_hash, is_valid) in zip(contributions, inspected)
+            if content_hash and is_valid
+        ]
+        owned = iter(self.claim_content(valid))
+        
+        results = []
+        for (contribution_id, _), (content_hash, is_valid) in zip(contributions, inspected):
+            is_unique = bool(content_hash and is_valid) and next(owned)
+            status = 'verified' if is_unique else 'rejected'
+            results.append({'status': status, 'contribution_id': contribution_id})
+        
+        verified = sum(result['status'] == 'verified' for result in results)
+        print(f"✅ Batch verified {verified}/{len(results)} in {time.perf_counter() - started:.2f}s")
+        return results
+    
+    def handle_task(self, task):
+        """Run a single verification task and report back to the context stream"""
+        with self.dedup.claimed(task.get('event_id')) as fresh:
+            if not fresh:
+                print(f"♻️ Duplicate task skipped: {task.get('event_id')}")
+                return None
+            
+            if task['task'] == 'verify_contribution':
+                result = self.verify_contribution(
+                    task['contribution_id'],
+                    task['data']
+                )
+                # Publish result to the context stream's results lane
+                self.redis.xadd(RESULTS, {
+                    'source': 'verification_branch',
+                    'event_id': task.get('event_id') or '',
+                    'result': json.dumps(result)
+                })
+                return result
+    
+    def handle_batch(self, tasks):
+        """Run a micro-batch of tasks, verifying contributions together"""
+        tasks = [task for task in tasks if self.dedup.claim(task.get('event_id'))]
+        verify = [task for task in tasks if task['task'] == 'verify_contribution']
+        if not verify:
+            return []
+        
+        try:
+            results = self.verify_batch([(task['contribution_id'], task['data']) for task in verify])
+            
+            pipe = self.redis.pipeline(transaction=False)
+            for task, result in zip(verify, results):
+                pipe.xadd(RESULTS, {
+                    'source': 'verification_branch',
+                    'event_id': task.get('event_id') or '',
+                    'result': json.dumps(result)
+                })
+            pipe.execute()
+        except Exception:
+            for task in verify:
+                self.dedup.release(task.get('event_id'))
+            raise
+        return results
+    
+    def collect_batch(self, pubsub):
+        """Block for one task, then gather more until the batch fills or the window closes"""
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            timeout = None if deadline is None else deadline - time.monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            message = pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+            if message is None:
+                if deadline is None:
+                    continue
+                break
+            try:
+                task = json.loads(message['data'])
+            except ValueError:
+                task = None
+            if not isinstance(task, dict):
+                print(f"⚠️ Skipped malformed task: {message['data'][:200]!r}")
+                continue
+            batch.append(task)
+            if deadline is None:
+                deadline = time.monotonic() + self.batch_window
+        return batch
     
     def listen(self):
         """Listen for verification tasks"""
         print("🌿 Verification Branch: Listening for tasks...")
         
-        for message in self.pubsub.listen():
-            if message['type'] == 'message':
-                task = json.loads(message['data'])
-                
-                if task['task'] == 'verify_contribution':
-                    result = self.verify_contribution(
-                        task['contribution_id'],
-                        task['data']
-                    )
-                    # Publish result back to context stream
-                    self.redis.xadd('context-stream', {
-                        'source': 'verification_branch',
-                        'result': json.dumps(result)
-                    })
+        pubsub = get_pubsub(self.channel)
+        while True:
+            batch = self.collect_batch(pubsub)
+            if batch:
+                self.handle_batch(batch)
 
 if __name__ == "__main__":
     agent = VerificationAgent()
@@ -3,21 +3,25 @@ WEALTH BRANCH
 Portfolio management and trading automation
 """
 import json
-import redis
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from roots.databases.connections import get_pubsub, get_redis
+from roots.databases.dedup import Deduplicator
+from roots.databases.streams import RESULTS
+from trunk.runtime.profiling import attach as attach_profiler
+
 load_dotenv()
 
 class WealthAgent:
+    channel = 'branch:wealth:task'
+
     def __init__(self):
-        self.redis = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
-        self.pubsub = self.redis.pubsub()
-        self.pubsub.subscribe('branch:wealth:task')
+        self.redis = get_redis()
+        self.dedup = Deduplicator('branch:wealth', client=self.redis, exclusive=False)
+        attach_profiler(self)
         
     def portfolio_update(self, data):
         """Update portfolio with new NFT asset"""
@@ -50,20 +54,30 @@ class WealthAgent:
         self.redis.set('portfolio:metrics', json.dumps(metrics))
         print("✅ Dashboard updated")
     
+    def handle_task(self, task):
+        """Run a single wealth management task and report back to the context stream"""
+        with self.dedup.claimed(task.get('event_id')) as fresh:
+            if not fresh:
+                print(f"♻️ Duplicate task skipped: {task.get('event_id')}")
+                return None
+            
+            if task['task'] == 'portfolio_update':
+                result = self.portfolio_update(task['data'])
+                self.redis.xadd(RESULTS, {
+                    'source': 'wealth_branch',
+                    'event_id': task.get('event_id') or '',
+                    'result': json.dumps(result)
+                })
+                return result
+    
     def listen(self):
         """Listen for wealth management tasks"""
         print("🌿 Wealth Branch: Listening for tasks...")
         
-        for message in self.pubsub.listen():
+        pubsub = get_pubsub(self.channel)
+        for message in pubsub.listen():
             if message['type'] == 'message':
-                task = json.loads(message['data'])
-                
-                if task['task'] == 'portfolio_update':
-                    result = self.portfolio_update(task['data'])
-                    self.redis.xadd('context-stream', {
-                        'source': 'wealth_branch',
-                        'result': json.dumps(result)
-                    })
+                self.handle_task(json.loads(message['data']))
 
 if __name__ == "__main__":
     agent = WealthAgent()
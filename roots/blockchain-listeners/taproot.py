@@ -5,24 +5,25 @@ Connects NWU Protocol smart contracts to the Tree's central nervous system
 import json
 import asyncio
 import os
-from web3 import Web3
-from redis import Redis
+import sys
 from dotenv import load_dotenv
 from datetime import datetime
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from roots.databases.connections import get_async_redis
+from roots.databases.dedup import AsyncDeduplicator, event_key
+
 load_dotenv()
 
 class TaprootBridge:
     def __init__(self):
-        # Connect to Ethereum
+        # Connect to Ethereum (web3 is heavy - only pay for it when bridging)
+        from web3 import Web3
         self.w3 = Web3(Web3.HTTPProvider(os.getenv('SEPOLIA_RPC_URL')))
         
         # Connect to Redis (Context Stream)
-        self.redis = Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
+        self.redis = get_async_redis()
+        self.dedup = AsyncDeduplicator('taproot', client=self.redis)
         
         # Load contract
         self.contract_address = os.getenv('NWU_PROTOCOL_ADDRESS')
@@ -53,12 +54,22 @@ class TaprootBridge:
             'event_name': event['event'],
             'block_number': event['blockNumber'],
             'tx_hash': event['transactionHash'].hex(),
+            'log_index': event['logIndex'],
             'timestamp': datetime.utcnow().isoformat(),
-            'args': dict(event['args'])
+            'args': json.dumps(dict(event['args']))
         }
         
+        # Filters re-deliver entries after RPC hiccups and restarts
+        if not await self.dedup.claim(event_key(event_data)):
+            print(f"♻️ Duplicate event skipped: {event['event']} {event_data['tx_hash']}")
+            return
+        
         # Write to Context Stream (Redis Stream)
-        stream_id = self.redis.xadd('context-stream', event_data)
+        try:
+            stream_id = await self.redis.xadd('context-stream', event_data)
+        except Exception:
+            await self.dedup.release(event_key(event_data))
+            raise
         
         print(f"⚡ Event synced: {event['event']} → Stream ID: {stream_id}")
         
@@ -70,19 +81,19 @@ class TaprootBridge:
         
         if event_name == 'ContributionSubmitted':
             # Trigger Verification Branch
-            self.redis.publish('branch:verification:wake', json.dumps(event_data))
+            await self.redis.publish('branch:verification:wake', json.dumps(event_data))
             print("🌿 Verification Branch activated")
             
         elif event_name == 'ContributionVerified':
             # Trigger Marketing Branch (celebrate success)
-            self.redis.publish('branch:marketing:wake', json.dumps(event_data))
+            await self.redis.publish('branch:marketing:wake', json.dumps(event_data))
             # Trigger Wealth Branch (new NFT minted = new asset)
-            self.redis.publish('branch:wealth:wake', json.dumps(event_data))
+            await self.redis.publish('branch:wealth:wake', json.dumps(event_data))
             print("🌿 Marketing & Wealth Branches activated")
             
         elif event_name == 'RewardDistributed':
             # Trigger Governance Branch (token circulation update)
-            self.redis.publish('branch:governance:wake', json.dumps(event_data))
+            await self.redis.publish('branch:governance:wake', json.dumps(event_data))
             print("🌿 Governance Branch activated")
     
     async def listen(self):
@@ -96,6 +107,7 @@ class TaprootBridge:
             try:
                 for event in event_filter.get_new_entries():
                     await self.sync_event_to_tree(event)
+                await self.dedup.flush()
                     
                 await asyncio.sleep(2)  # Poll every 2 seconds
                 
@@ -0,0 +1,282 @@
+"""
+REDIS CONNECTION FACTORY
+Shared, bounded connection pools for every Tree component
+"""
+import os
+import socket
+import threading
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Every component reads the same environment, so pools are keyed only by
+# the handful of options that actually change the wire behaviour
+_sync_pools: Dict[Tuple, redis.BlockingConnectionPool] = {}
+_async_pools: Dict[Tuple, aioredis.BlockingConnectionPool] = {}
+_caches: Dict[Tuple[str, ...], 'CachedReader'] = {}
+_lock = threading.Lock()
+
+
+def _keepalive_options() -> Dict[int, int]:
+    """TCP keepalive tuning, limited to what the platform exposes"""
+    options = {}
+    for name, default in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = default
+    return options
+
+
+def connection_settings(decode_responses=True, blocking_reads=False) -> Dict:
+    """
+    Connection kwargs shared by every pool. Pools that park on blocking
+    reads (pub/sub listeners) get no socket read timeout - liveness is
+    covered by keepalive and periodic health checks instead - and stay on
+    RESP2, where pub/sub messages arrive as plain replies rather than
+    push frames.
+    """
+    return {
+        'host': os.getenv('REDIS_HOST', 'localhost'),
+        'port': int(os.getenv('REDIS_PORT', 6379)),
+        'password': os.getenv('REDIS_PASSWORD') or None,
+        'db': int(os.getenv('REDIS_DB', 0)),
+        'protocol': 2 if blocking_reads else int(os.getenv('REDIS_PROTOCOL', 3)),
+        'decode_responses': decode_responses,
+        'socket_timeout': None if blocking_reads else float(os.getenv('REDIS_SOCKET_TIMEOUT', 5)),
+        'socket_connect_timeout': float(os.getenv('REDIS_CONNECT_TIMEOUT', 2)),
+        'socket_keepalive': True,
+        'socket_keepalive_options': _keepalive_options(),
+        'health_check_interval': int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30)),
+        'retry_on_timeout': True,
+    }
+
+
+def _pool_limits(blocking_reads):
+    max_connections = int(os.getenv('REDIS_MAX_CONNECTIONS', 20))
+    if blocking_reads:
+        # One parked connection per subscriber; a process hosts few of them
+        max_connections = int(os.getenv('REDIS_MAX_PUBSUB_CONNECTIONS', 8))
+    return max_connections, float(os.getenv('REDIS_POOL_TIMEOUT', 10))
+
+
+def _sync_pool(decode_responses, blocking_reads):
+    key = (decode_responses, blocking_reads)
+    pool = _sync_pools.get(key)
+    if pool is None:
+        with _lock:
+            pool = _sync_pools.get(key)
+            if pool is None:
+                max_connections, timeout = _pool_limits(blocking_reads)
+                pool = redis.BlockingConnectionPool(
+                    max_connections=max_connections,
+                    timeout=timeout,
+                    **connection_settings(decode_responses, blocking_reads)
+                )
+                _sync_pools[key] = pool
+    return pool
+
+
+def get_redis(decode_responses=True) -> redis.Redis:
+    """Sync client backed by the process-wide pool"""
+    return redis.Redis(connection_pool=_sync_pool(decode_responses, False))
+
+
+def get_pubsub(*channels, decode_responses=True) -> redis.client.PubSub:
+    """Pub/sub handle on the listener pool, already subscribed to ``channels``"""
+    client = redis.Redis(connection_pool=_sync_pool(decode_responses, True))
+    pubsub = client.pubsub()
+    if channels:
+        pubsub.subscribe(*channels)
+    return pubsub
+
+
+def get_async_redis(decode_responses=True, blocking_reads=False) -> aioredis.Redis:
+    """
+    Asyncio client backed by the process-wide async pool. Async
+    connections are bound to the event loop that opened them, so a
+    process should drive these from a single loop.
+    """
+    key = (decode_responses, blocking_reads)
+    pool = _async_pools.get(key)
+    if pool is None:
+        with _lock:
+            pool = _async_pools.get(key)
+            if pool is None:
+                max_connections, timeout = _pool_limits(blocking_reads)
+                pool = aioredis.BlockingConnectionPool(
+                    max_connections=max_connections,
+                    timeout=timeout,
+                    **connection_settings(decode_responses, blocking_reads)
+                )
+                _async_pools[key] = pool
+    return aioredis.Redis(connection_pool=pool)
+
+
+class _Fill:
+    """Placeholder for a cache entry whose GET is still in flight"""
+
+
+class CachedReader:
+    """
+    Client-side cache for hot read keys (e.g. ``portfolio:metrics``).
+
+    Reads go through a dedicated connection with server-assisted
+    ``CLIENT TRACKING`` in broadcast mode for the given key prefixes.
+    Invalidations are redirected to a pub/sub listener thread that evicts
+    local entries, so a cached value is served until Redis says it changed.
+    """
+
+    def __init__(self, prefixes: Iterable[str]):
+        self.prefixes = tuple(prefixes)
+        self.cache: Dict[str, Optional[str]] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+        self._cache_lock = threading.Lock()
+        self._listener_id = None
+        self._reader = None
+
+        listener_settings = connection_settings(blocking_reads=True)
+        listener_settings['redis_connect_func'] = self._on_listener_connect
+        self._invalidations = redis.Redis(**listener_settings).pubsub()
+        # Subscribing connects eagerly, so the listener id is known before
+        # the reader ever asks for a redirect target
+        self._invalidations.subscribe('__redis__:invalidate')
+
+        reader_settings = connection_settings()
+        reader_settings['redis_connect_func'] = self._on_reader_connect
+        self._reader = redis.Redis(
+            connection_pool=redis.BlockingConnectionPool(max_connections=1, **reader_settings)
+        )
+
+        self._thread = threading.Thread(target=self._drain_invalidations, daemon=True)
+        self._thread.start()
+
+    def _on_listener_connect(self, connection):
+        # Runs before the pub/sub layer re-subscribes, while CLIENT ID is
+        # still a legal command on this connection
+        connection.on_connect()
+        connection.send_command('CLIENT', 'ID')
+        self._listener_id = connection.read_response()
+        # A new listener id orphans the reader's redirect; force the reader
+        # to reconnect and drop whatever it cached in the meantime
+        if self._reader is not None:
+            self._reader.connection_pool.disconnect()
+        self.clear()
+
+    def _on_reader_connect(self, connection):
+        connection.on_connect()
+        args = ['CLIENT', 'TRACKING', 'ON', 'REDIRECT', self._listener_id, 'BCAST']
+        for prefix in self.prefixes:
+            args += ['PREFIX', prefix]
+        connection.send_command(*args)
+        connection.read_response()
+        self.clear()
+
+    def _drain_invalidations(self):
+        while True:
+            try:
+                for message in self._invalidations.listen():
+                    if message['type'] != 'message':
+                        continue
+                    keys = message['data']
+                    with self._cache_lock:
+                        if not keys:
+                            self.cache.clear()
+                        else:
+                            for key in keys:
+                                self.cache.pop(key, None)
+                        self.stats['invalidations'] += 1
+            except Exception as e:
+                print(f"❌ Cache invalidation listener error: {e}")
+                self.clear()
+                time.sleep(1)
+
+    def get(self, key: str) -> Optional[str]:
+        # A fill in flight leaves a placeholder; an invalidation that lands
+        # between our GET and storing the reply evicts it, and the stale
+        # reply is then returned without being cached
+        fill = _Fill()
+        with self._cache_lock:
+            cached = self.cache.get(key, fill)
+            if cached is not fill and not isinstance(cached, _Fill):
+                self.stats['hits'] += 1
+                return cached
+            self.cache[key] = fill
+            self.stats['misses'] += 1
+        value = self._reader.get(key)
+        with self._cache_lock:
+            if self.cache.get(key) is fill:
+                self.cache[key] = value
+        return value
+
+    def clear(self):
+        with self._cache_lock:
+            self.cache.clear()
+
+
+def get_cached_reader(*prefixes) -> CachedReader:
+    """Shared client-side cache for the given key prefixes"""
+    key = tuple(sorted(prefixes))
+    with _lock:
+        reader = _caches.get(key)
+        if reader is None:
+            reader = _caches[key] = CachedReader(key)
+    return reader
+
+
+def iter_stream_entries(response) -> Iterator[Tuple[str, str, Dict]]:
+    """
+    Flatten an XREAD/XREADGROUP reply into (stream, id, fields) tuples.
+    RESP2 replies are a list of [stream, entries]; RESP3 replies are a map
+    of stream -> [entries].
+    """
+    if not response:
+        return
+    if isinstance(response, dict):
+        for stream, batches in response.items():
+            for entries in batches:
+                for entry_id, fields in entries:
+                    yield stream, entry_id, fields
+    else:
+        for stream, entries in response:
+            for entry_id, fields in entries:
+                yield stream, entry_id, fields
+
+
+def _sync_pool_usage(pool):
+    created = len(pool._connections)
+    idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    return {
+        'max_connections': pool.max_connections,
+        'created': created,
+        'in_use': created - idle,
+        'idle': idle,
+    }
+
+
+def _async_pool_usage(pool):
+    in_use = len(pool._in_use_connections)
+    idle = len(pool._available_connections)
+    return {
+        'max_connections': pool.max_connections,
+        'created': in_use + idle,
+        'in_use': in_use,
+        'idle': idle,
+    }
+
+
+def pool_stats() -> Dict:
+    """Connection usage for every pool opened in this process"""
+    stats = {}
+    for (decode, blocking), pool in list(_sync_pools.items()):
+        name = 'sync:' + ('pubsub' if blocking else 'commands') + ('' if decode else ':raw')
+        stats[name] = _sync_pool_usage(pool)
+    for (decode, blocking), pool in list(_async_pools.items()):
+        name = 'async:' + ('pubsub' if blocking else 'commands') + ('' if decode else ':raw')
+        stats[name] = _async_pool_usage(pool)
+    for prefixes, reader in list(_caches.items()):
+        stats['cache:' + ','.join(prefixes)] = dict(reader.stats, entries=len(reader.cache))
+    return stats
@@ -0,0 +1,324 @@
+"""
+EVENT DEDUPLICATION
+Idempotency guard shared by taproot, the orchestrator and the branches
+"""
+import hashlib
+import math
+import os
+import time
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, List, Optional
+
+from roots.databases.connections import get_async_redis, get_redis
+
+STATS_KEY = 'dedup:stats'
+
+_instances: List['Deduplicator'] = []
+
+
+def event_key(event_data: Dict, entry_id: Optional[str] = None) -> Optional[str]:
+    """
+    Stable identity of an event: (tx_hash, log_index) for chain events,
+    the envelope id for anything that carries one, and the stream entry
+    id as a last resort.
+    """
+    tx_hash = event_data.get('tx_hash')
+    if tx_hash:
+        return f"tx:{tx_hash}:{event_data.get('log_index', 0)}"
+    if event_data.get('event_id'):
+        return str(event_data['event_id'])
+    if entry_id:
+        return f"entry:{entry_id}"
+    return None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` keys at ``error_rate``"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.num_bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class Deduplicator:
+    """
+    Two-tier "have we done this already?" check for one processing scope.
+
+    A rotating pair of Bloom filters keeps memory fixed no matter how many
+    events flow through. While the filters hold every key whose marker may
+    still be live, a filter miss proves the scope never claimed the key, so
+    the claim is only queued and written to Redis in the next pipelined
+    flush. A filter hit may be a false positive, so it is settled exactly
+    with ``SET NX`` against a per-key Redis marker that expires after
+    ``ttl`` seconds.
+
+    Once more than two generations' worth of keys have passed through
+    (live traffic, or ``warm()`` loading more markers than that), rotation
+    drops the oldest generation and a miss proves nothing. Misses then take
+    the exact path too, until ``ttl`` after the last drop, when every
+    marker the dropped keys could have had has expired.
+
+    The miss fast path assumes one consumer per scope (one taproot, one
+    orchestrator) and a filter warmed from Redis at startup; queued claims
+    are lost if the process dies before the next flush, which only means
+    those events may be handled once more. Scopes with several consumers,
+    or whose work is rare and expensive enough that one round trip per
+    claim does not matter (the branch agents), pass ``exclusive=False``
+    and always claim atomically in Redis.
+
+    A claim is taken before the work it guards. ``claimed()`` releases it
+    again if that work raises, so the same work delivered once more (a task
+    re-published by hand, a replay from an earlier offset) is handled rather
+    than skipped; nothing re-delivers it on its own.
+    """
+
+    def __init__(self, scope: str, client=None, exclusive=True, ttl=None,
+                 capacity=None, error_rate=None):
+        self.scope = scope
+        self.redis = client if client is not None else self._default_client()
+        self.exclusive = exclusive
+        self.ttl = int(ttl or os.getenv('DEDUP_TTL_SECONDS', 7 * 24 * 3600))
+        self.capacity = int(capacity or os.getenv('DEDUP_FILTER_CAPACITY', 100_000))
+        self.error_rate = float(error_rate or os.getenv('DEDUP_FILTER_ERROR_RATE', 0.001))
+        self.flush_size = int(os.getenv('DEDUP_FLUSH_SIZE', 64))
+        self.flush_interval = float(os.getenv('DEDUP_FLUSH_INTERVAL', 0.5))
+
+        self._current = BloomFilter(self.capacity, self.error_rate)
+        self._previous: Optional[BloomFilter] = None
+        self._pending: List[str] = []
+        self._pending_since = 0.0
+        self._unexported: Counter = Counter()
+        self._warm = False
+        self._exact_until = 0.0
+
+        self.stats = {
+            'checked': 0,
+            'new': 0,
+            'duplicates': 0,
+            'filter_hits': 0,
+            'filter_misses': 0,
+            'false_positives': 0,
+            'released': 0,
+        }
+        _instances.append(self)
+
+    def _default_client(self):
+        return get_redis()
+
+    def _marker(self, key: str) -> str:
+        return f"dedup:{self.scope}:{key}"
+
+    def _in_filter(self, key: str) -> bool:
+        return key in self._current or (self._previous is not None and key in self._previous)
+
+    def _remember(self, key: str):
+        if self._current.count >= self.capacity:
+            # Rotate instead of growing: the previous generation still
+            # answers for recent keys while the new one fills up
+            if self._previous is not None:
+                # Keys in the generation being dropped may still have live
+                # markers; those were all set by now, so they are gone by
+                # now + ttl
+                self._exact_until = time.monotonic() + self.ttl
+            self._previous = self._current
+            self._current = BloomFilter(self.capacity, self.error_rate)
+        self._current.add(key)
+
+    def _count(self, is_new: bool, filter_hit: bool):
+        fields = ['checked', 'new' if is_new else 'duplicates']
+        fields.append('filter_hits' if filter_hit else 'filter_misses')
+        if filter_hit and is_new:
+            fields.append('false_positives')
+        for field in fields:
+            self.stats[field] += 1
+            self._unexported[field] += 1
+
+    def _fast_path(self, key: str) -> bool:
+        """True when the key can be accepted without asking Redis"""
+        if (
+            self.exclusive and self._warm
+            and time.monotonic() >= self._exact_until
+            and not self._in_filter(key)
+        ):
+            self._remember(key)
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(key)
+            self._count(True, False)
+            return True
+        return False
+
+    def _flush_due(self) -> bool:
+        return bool(self._pending) and (
+            len(self._pending) >= self.flush_size
+            or time.monotonic() - self._pending_since >= self.flush_interval
+        )
+
+    def _pipeline(self):
+        """Pipeline preloaded with queued claims and unexported counters"""
+        pipe = self.redis.pipeline(transaction=False)
+        for key in self._pending:
+            pipe.set(self._marker(key), 1, ex=self.ttl)
+        for field, value in self._unexported.items():
+            if value:
+                pipe.hincrby(STATS_KEY, f"{self.scope}:{field}", value)
+        self._pending = []
+        self._unexported = Counter()
+        return pipe
+
+    def _forget(self, key: str):
+        # The Bloom filter cannot unlearn the key; a later claim just takes
+        # the exact path and finds the marker gone
+        if key in self._pending:
+            self._pending.remove(key)
+        self.stats['released'] += 1
+        self._unexported['released'] += 1
+
+    def _settle(self, key: str, claimed) -> bool:
+        filter_hit = self._in_filter(key)
+        self._remember(key)
+        self._count(bool(claimed), filter_hit)
+        return bool(claimed)
+
+    # --- sync Redis access -------------------------------------------------
+
+    def warm(self):
+        """Load markers that are still live in Redis into the filter"""
+        prefix = self._marker('')
+        for marker in self.redis.scan_iter(match=prefix + '*', count=1000):
+            self._remember(marker[len(prefix):])
+        self._warm = True
+
+    def flush(self):
+        """Write queued claims and counters to Redis in one pipeline"""
+        if self._pending or any(self._unexported.values()):
+            self._pipeline().execute()
+
+    def claim(self, key: str) -> bool:
+        """Record ``key`` for this scope; False if it was already claimed"""
+        if key is None:
+            # Nothing to key on - let it through rather than drop it
+            return True
+        if self.exclusive and not self._warm:
+            self.warm()
+        if self._fast_path(key):
+            if self._flush_due():
+                self.flush()
+            return True
+
+        # Queued claims ride along in the same round trip as the exact check
+        pipe = self._pipeline()
+        pipe.set(self._marker(key), 1, nx=True, ex=self.ttl)
+        return self._settle(key, pipe.execute()[-1])
+
+    def release(self, key: str):
+        """Undo a claim whose work failed, so a retry is not taken for a duplicate"""
+        if key is None:
+            return
+        self._forget(key)
+        pipe = self._pipeline()
+        pipe.delete(self._marker(key))
+        pipe.execute()
+
+    @contextmanager
+    def claimed(self, key: str):
+        """``with dedup.claimed(key) as fresh:`` - claim for the body, released if it raises"""
+        fresh = self.claim(key)
+        try:
+            yield fresh
+        except Exception:
+            if fresh:
+                self.release(key)
+            raise
+
+    def rates(self) -> Dict:
+        checked = self.stats['checked'] or 1
+        return dict(
+            self.stats,
+            duplicate_rate=self.stats['duplicates'] / checked,
+            filter_hit_rate=self.stats['filter_hits'] / checked,
+            pending=len(self._pending),
+            exact_only=time.monotonic() < self._exact_until,
+        )
+
+
+class AsyncDeduplicator(Deduplicator):
+    """Deduplicator for asyncio components; same semantics, awaitable I/O"""
+
+    def _default_client(self):
+        return get_async_redis()
+
+    async def warm(self):
+        prefix = self._marker('')
+        async for marker in self.redis.scan_iter(match=prefix + '*', count=1000):
+            self._remember(marker[len(prefix):])
+        self._warm = True
+
+    async def flush(self):
+        if self._pending or any(self._unexported.values()):
+            await self._pipeline().execute()
+
+    async def claim(self, key: str) -> bool:
+        if key is None:
+            return True
+        if self.exclusive and not self._warm:
+            await self.warm()
+        if self._fast_path(key):
+            if self._flush_due():
+                await self.flush()
+            return True
+
+        pipe = self._pipeline()
+        pipe.set(self._marker(key), 1, nx=True, ex=self.ttl)
+        return self._settle(key, (await pipe.execute())[-1])
+
+    async def release(self, key: str):
+        if key is None:
+            return
+        self._forget(key)
+        pipe = self._pipeline()
+        pipe.delete(self._marker(key))
+        await pipe.execute()
+
+    @asynccontextmanager
+    async def claimed(self, key: str):
+        fresh = await self.claim(key)
+        try:
+            yield fresh
+        except Exception:
+            if fresh:
+                await self.release(key)
+            raise
+
+
+def dedup_stats() -> Dict:
+    """Hit/miss counters for every deduplicator in this process"""
+    return {d.scope: d.rates() for d in _instances}
+
+
+def exported_stats(client=None) -> Dict:
+    """Counters aggregated across all processes, as exported to Redis"""
+    client = client if client is not None else get_redis()
+    stats: Dict[str, Dict[str, int]] = {}
+    for field, value in client.hgetall(STATS_KEY).items():
+        scope, _, name = field.rpartition(':')
+        stats.setdefault(scope, {})[name] = int(value)
+    return stats
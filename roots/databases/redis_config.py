@@ -2,19 +2,16 @@
 REDIS MEMORY CONFIGURATION
 Central memory hub for the Tree's Context Stream
 """
-import redis
 import os
 from dotenv import load_dotenv
 
+from roots.databases.connections import get_redis, pool_stats
+
 load_dotenv()
 
 class RedisMemory:
     def __init__(self):
-        self.client = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
+        self.client = get_redis()
         
     def create_context_stream(self):
         """Initialize the central context stream"""
@@ -29,3 +26,7 @@ class RedisMemory:
             return True
         except:
             return False
+            
+    def pool_stats(self):
+        """Connection pool usage for this process"""
+        return pool_stats()
@@ -0,0 +1,31 @@
+"""
+CONTEXT STREAM LANES
+The Context Stream split into priority classes, one Redis stream each
+"""
+import os
+from typing import Dict
+
+# Chain events keep the original stream name so existing producers and
+# tooling (taproot, health checks, consumer groups) are unaffected
+CHAIN = 'context-stream'
+WEBHOOKS = 'context-stream:webhooks'
+RESULTS = 'context-stream:results'
+
+LANES = (CHAIN, WEBHOOKS, RESULTS)
+
+# Entries the orchestrator gave up on after repeated failures. Not a lane:
+# nothing schedules it, it is kept for inspection and manual replay
+DEAD_LETTER = 'context-stream:dead-letter'
+
+DEFAULT_WEIGHTS = {CHAIN: 8, WEBHOOKS: 4, RESULTS: 1}
+
+
+def lane_weights() -> Dict[str, int]:
+    """Scheduling weight per lane, overridable via LANE_WEIGHT_<LANE>"""
+    weights = {}
+    for lane, default in DEFAULT_WEIGHTS.items():
+        name = 'LANE_WEIGHT_' + (lane.split(':', 1)[1] if ':' in lane else 'chain').upper()
+        # A lane with weight 0 would never be served; clamp so every lane
+        # with a backlog gets at least one slot per round
+        weights[lane] = max(1, int(os.getenv(name, default)))
+    return weights
@@ -3,18 +3,22 @@ VECTOR MEMORY CONFIGURATION
 Long-term semantic memory for AI agents
 """
 import os
-from pinecone import Pinecone, ServerlessSpec
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class VectorMemory:
     def __init__(self):
+        # Imported here so modules that merely reference VectorMemory do
+        # not pay the pinecone import cost
+        from pinecone import Pinecone
         self.pc = Pinecone(api_key=os.getenv('PINECONE_API_KEY'))
         self.index_name = 'tree-of-life-memory'
         
     def create_index(self):
         """Create vector index for semantic search"""
+        from pinecone import ServerlessSpec
+        
         if self.index_name not in self.pc.list_indexes().names():
             self.pc.create_index(
                 name=self.index_name,
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+STARTUP BENCHMARK
+Compare cold-start time and resident memory of one process per component
+against a single launcher process hosting all of them
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, ROOT)
+from trunk.runtime.launcher import COMPONENTS
+
+# Construct the components exactly as the launcher would, then report peak
+# RSS. Nothing here waits on Redis - clients connect lazily on first use and
+# the profiling control thread subscribes in the background.
+PROBE = """
+import json, resource, sys
+sys.path.insert(0, {root!r})
+from trunk.runtime.launcher import load_component
+for name in {names!r}:
+    load_component(name)
+print(json.dumps({{'rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def probe(names):
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, '-c', PROBE.format(root=ROOT, names=list(names))],
+        check=True, capture_output=True, text=True
+    ).stdout
+    elapsed = time.perf_counter() - start
+    rss_kb = json.loads(out.strip().splitlines()[-1])['rss_kb']
+    return elapsed, rss_kb
+
+
+def run(rounds=3):
+    names = list(COMPONENTS)
+
+    per_process = []
+    for _ in range(rounds):
+        samples = [probe([name]) for name in names]
+        per_process.append((sum(t for t, _ in samples), sum(r for _, r in samples)))
+    single = [probe(names) for _ in range(rounds)]
+
+    pp_time, pp_rss = min(per_process)
+    sp_time, sp_rss = min(single)
+    print(f"🌳 Components: {', '.join(names)}")
+    print(f"🐢 One process each: {pp_time * 1000:.0f} ms total startup, {pp_rss / 1024:.1f} MB RSS")
+    print(f"🚀 Single launcher:  {sp_time * 1000:.0f} ms startup, {sp_rss / 1024:.1f} MB RSS")
+    print(f"📉 Saved: {(1 - sp_time / pp_time) * 100:.0f}% startup, {(1 - sp_rss / pp_rss) * 100:.0f}% memory")
+
+
+if __name__ == "__main__":
+    run()
@@ -3,18 +3,19 @@
 HEALTH CHECK SCRIPT
 Verify all Tree components are running
 """
-import redis
 import os
+import sys
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from roots.databases.connections import get_redis
+from roots.databases.dedup import exported_stats
+
 load_dotenv()
 
 def check_redis():
     try:
-        r = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379))
-        )
+        r = get_redis()
         r.ping()
         print("✅ Redis: ONLINE")
         return True
@@ -24,11 +25,7 @@ def check_redis():
 
 def check_context_stream():
     try:
-        r = redis.Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
+        r = get_redis()
         info = r.xinfo_stream('context-stream')
         print(f"✅ Context Stream: {info['length']} events")
         return True
@@ -36,12 +33,25 @@ def check_context_stream():
         print("❌ Context Stream: NOT INITIALIZED")
         return False
 
+def report_dedup():
+    try:
+        for scope, counters in sorted(exported_stats().items()):
+            checked = counters.get('checked', 0) or 1
+            print(
+                f"♻️ Dedup {scope}: {counters.get('duplicates', 0)} duplicates / "
+                f"{counters.get('checked', 0)} checked, filter hit rate "
+                f"{counters.get('filter_hits', 0) / checked:.0%}"
+            )
+    except:
+        print("⚠️ Dedup stats unavailable")
+
 if __name__ == "__main__":
     print("🌳 Tree of Life Health Check")
     print("="*40)
     
     redis_ok = check_redis()
     stream_ok = check_context_stream()
+    report_dedup()
     
     print("="*40)
     
@@ -14,17 +14,16 @@ echo "2. Starting Taproot Bridge..."
 python roots/blockchain-listeners/taproot.py &
 TAPROOT_PID=$!
 
-# 3. Start Master Orchestrator
-echo "3. Starting Master Orchestrator..."
-python trunk/orchestrator/main.py &
+# 3. Start Master Orchestrator and Branch Agents
+# One process hosts them all; set TREE_WORKERS=0 to spread them over a
+# supervised pool sized to the core count instead
+echo "3. Starting Master Orchestrator & Branch Agents..."
+python trunk/runtime/launcher.py orchestrator verification marketing governance wealth &
 ORCHESTRATOR_PID=$!
 
-# 4. Start Branch Agents
-echo "4. Starting Branch Agents..."
-python branches/verification/verify_agent.py &
-python branches/governance/dao_agent.py &
-python branches/marketing/content_agent.py &
-python branches/wealth/trading_agent.py &
+# 4. Start Postgres Sink (Context Stream history)
+echo "4. Starting Postgres Sink..."
+python roots/databases/postgres_sink.py &
 
 echo ""
 echo "✅ All systems started!"
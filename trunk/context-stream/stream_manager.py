@@ -7,9 +7,11 @@ import json
 from datetime import datetime
 
 class ContextStreamManager:
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, stream_name='context-stream'):
+        # Producers outside the chain (e.g. webhooks) pass their lane,
+        # such as 'context-stream:webhooks', so they are scheduled apart
         self.redis = redis_client
-        self.stream_name = 'context-stream'
+        self.stream_name = stream_name
         
     def publish_event(self, source, event_type, payload):
         """Publish event to context stream"""
@@ -4,74 +4,209 @@ Receives events from Context Stream and delegates to branches
 """
 import asyncio
 import json
-from redis import Redis
+import sys
+import time
+from collections import Counter
 from dotenv import load_dotenv
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from roots.databases.connections import get_async_redis, iter_stream_entries
+from roots.databases.dedup import AsyncDeduplicator, dedup_stats, event_key
+from roots.databases.streams import DEAD_LETTER, lane_weights
+from trunk.runtime.profiling import attach as attach_profiler
+
 load_dotenv()
 
+# Lane -> id of the last entry the orchestrator has handled
+OFFSETS_KEY = 'orchestrator:offsets'
+
+# Seconds a lane waits before its failing entry is tried again
+RETRY_DELAY = 1
+
 class MasterOrchestrator:
+    # Event name -> branches it activates
+    ROUTES = {
+        'ContributionSubmitted': ('verification',),
+        'ContributionVerified': ('marketing', 'wealth'),
+    }
+    
     def __init__(self):
-        self.redis = Redis(
-            host=os.getenv('REDIS_HOST', 'localhost'),
-            port=int(os.getenv('REDIS_PORT', 6379)),
-            decode_responses=True
-        )
+        self.redis = get_async_redis()
+        # Lanes are read undecoded so unroutable entries can be dropped
+        # by comparing raw bytes, without decoding a single field
+        self.raw_redis = get_async_redis(decode_responses=False)
+        self.dedup = AsyncDeduplicator('orchestrator', client=self.redis)
         
+        # Handlers are looked up by name on each event so profiling hooks
+        # switched on at runtime take effect
         self.branches = {
-            'verification': self.handle_verification,
-            'marketing': self.handle_marketing,
-            'governance': self.handle_governance,
-            'wealth': self.handle_wealth
+            'verification': 'handle_verification',
+            'marketing': 'handle_marketing',
+            'governance': 'handle_governance',
+            'wealth': 'handle_wealth'
         }
+        self.raw_routes = {name.encode() for name in self.ROUTES}
+        
+        # Lanes in priority order; each round serves up to weight * quantum
+        # entries per lane, so every lane with a backlog is visited once per
+        # round and the lowest lane waits at most one round
+        self.weights = dict(sorted(lane_weights().items(), key=lambda lane: -lane[1]))
+        self.quantum = int(os.getenv('LANE_QUANTUM', 10))
+        self.last_ids = {lane: '0-0' for lane in self.weights}
+        self.saved_ids = dict(self.last_ids)
+        
+        # A failing entry holds up its own lane only; after max_attempts it
+        # is moved to the dead-letter stream so the lane can carry on
+        self.max_attempts = max(1, int(os.getenv('LANE_MAX_ATTEMPTS', 5)))
+        self.failures = Counter()
+        self.retry_at = {}
         
         self.stats = {
             'events_processed': 0,
+            'events_dropped': 0,
             'branches_activated': 0,
+            'duplicates_skipped': 0,
+            'events_dead_lettered': 0,
+            'lanes': {lane: 0 for lane in self.weights},
             'uptime_start': None
         }
+        attach_profiler(self)
         
     async def read_context_stream(self):
-        """Read from the central Context Stream"""
-        print("📡 Listening to Context Stream...")
-        
-        # Read from Redis Stream
-        last_id = '0-0'
+        """Read the Context Stream lanes with weighted fair scheduling"""
+        # Resume where the last run left off, so a restart replays at most
+        # the entries handled since the last saved round
+        saved = await self.redis.hgetall(OFFSETS_KEY)
+        self.last_ids.update({lane: saved[lane] for lane in self.last_ids if lane in saved})
+        self.saved_ids = dict(self.last_ids)
+        print(f"📡 Listening to Context Stream from {self.last_ids}")
         
         while True:
             try:
-                # Read new messages from stream
-                messages = self.redis.xread(
-                    {'context-stream': last_id},
-                    count=10,
-                    block=1000
-                )
-                
-                for stream_name, stream_messages in messages:
-                    for message_id, data in stream_messages:
-                        await self.process_event(data)
-                        last_id = message_id
-                        self.stats['events_processed'] += 1
+                served = await self.run_round()
+                lanes = self.ready_lanes()
+                if not served and lanes:
+                    # Every lane is idle - park on all of them at once
+                    messages = await self.raw_redis.xread(
+                        lanes,
+                        count=self.quantum,
+                        block=1000
+                    )
+                    await self.dispatch_entries(messages)
+                elif not served:
+                    # Only lanes waiting to retry a failing entry are left
+                    await asyncio.sleep(RETRY_DELAY)
+                await self.dedup.flush()
                         
             except Exception as e:
                 print(f"❌ Stream error: {e}")
                 await asyncio.sleep(1)
     
-    async def process_event(self, event_data):
+    def ready_lanes(self):
+        """Lane -> offset for every lane not waiting to retry a failure"""
+        now = time.monotonic()
+        return {lane: self.last_ids[lane] for lane in self.weights if self.retry_at.get(lane, 0) <= now}
+    
+    async def run_round(self):
+        """Serve one weighted round across all lanes; returns entries handled"""
+        lanes = self.ready_lanes()
+        pipe = self.raw_redis.pipeline(transaction=False)
+        offsets = dict(self.last_ids)
+        save = offsets != self.saved_ids
+        if save:
+            # Offsets handled so far ride along with this round's reads
+            pipe.hset(OFFSETS_KEY, mapping=offsets)
+        for lane, last_id in lanes.items():
+            pipe.xread({lane: last_id}, count=self.weights[lane] * self.quantum)
+        replies = await pipe.execute()
+        if save:
+            self.saved_ids = offsets
+            replies = replies[1:]
+        served = 0
+        for messages in replies:
+            served += await self.dispatch_entries(messages)
+        return served
+    
+    async def dispatch_entries(self, messages):
+        """Route raw lane entries, dropping unroutable ones undecoded"""
+        served = 0
+        stalled = set()
+        for stream_name, message_id, fields in iter_stream_entries(messages):
+            lane = stream_name.decode()
+            entry_id = message_id.decode()
+            if lane in stalled:
+                continue
+            
+            if fields.get(b'event_name') not in self.raw_routes:
+                self.stats['events_dropped'] += 1
+            else:
+                try:
+                    data = {key.decode(): value.decode() for key, value in fields.items()}
+                    await self.process_event(data, entry_id)
+                    self.stats['events_processed'] += 1
+                    self.failures.pop((lane, entry_id), None)
+                except Exception as e:
+                    if not await self.record_failure(lane, entry_id, fields, e):
+                        # The next read of this lane starts from it again
+                        stalled.add(lane)
+                        continue
+            
+            # Only move past an entry once it is handled or dead-lettered
+            self.last_ids[lane] = entry_id
+            self.stats['lanes'][lane] += 1
+            served += 1
+        return served
+    
+    async def record_failure(self, lane, entry_id, fields, error):
+        """Count a failed attempt; returns True once the entry is dead-lettered"""
+        key = (lane, entry_id)
+        self.failures[key] += 1
+        if self.failures[key] < self.max_attempts:
+            print(f"⚠️ {lane} {entry_id} failed ({self.failures[key]}/{self.max_attempts}): {error}")
+            self.retry_at[lane] = time.monotonic() + RETRY_DELAY
+            return False
+        
+        entry = {name.decode(errors='replace'): value.decode(errors='replace') for name, value in fields.items()}
+        await self.redis.xadd(DEAD_LETTER, {
+            'lane': lane,
+            'entry_id': entry_id,
+            'error': f"{type(error).__name__}: {error}",
+            'entry': json.dumps(entry)
+        }, maxlen=10000, approximate=True)
+        del self.failures[key]
+        self.retry_at.pop(lane, None)
+        self.stats['events_dead_lettered'] += 1
+        print(f"☠️ {lane} {entry_id} dead-lettered after {self.max_attempts} attempts: {error}")
+        return True
+    
+    async def process_event(self, event_data, entry_id=None):
         """Process event and delegate to appropriate branch"""
         event_name = event_data.get('event_name')
         source = event_data.get('source')
         
+        if event_name not in self.ROUTES:
+            return
+        
         print(f"🔄 Processing: {event_name} from {source}")
         
-        # Delegate to branches based on event type
-        if event_name == 'ContributionSubmitted':
-            await self.branches['verification'](event_data)
-            self.stats['branches_activated'] += 1
-        elif event_name == 'ContributionVerified':
-            await self.branches['marketing'](event_data)
-            await self.branches['wealth'](event_data)
-            self.stats['branches_activated'] += 2
+        # Replays after a restart and re-delivered chain events stop here
+        event_id = event_key(event_data, entry_id)
+        async with self.dedup.claimed(event_id) as fresh:
+            if not fresh:
+                print(f"♻️ Duplicate skipped: {event_id}")
+                self.stats['duplicates_skipped'] += 1
+                return
+            event_data['event_id'] = event_id
+            if isinstance(event_data.get('args'), str):
+                event_data['args'] = json.loads(event_data['args'])
+            
+            # Delegate to branches based on event type. If one raises, the
+            # claim is released and the lane offset stays put, so the event
+            # is read again; branches that already got it drop the repeat
+            for branch in self.ROUTES[event_name]:
+                await getattr(self, self.branches[branch])(event_data)
+                self.stats['branches_activated'] += 1
     
     async def handle_verification(self, data):
         """Verification Branch Handler"""
@@ -79,8 +214,9 @@ class MasterOrchestrator:
         contribution_id = data.get('args', {}).get('contributionId')
         # TODO: Trigger verification agents
         # For now, publish to verification branch's listener
-        self.redis.publish('branch:verification:task', json.dumps({
+        await self.redis.publish('branch:verification:task', json.dumps({
             'task': 'verify_contribution',
+            'event_id': data.get('event_id'),
             'contribution_id': contribution_id,
             'data': data
         }))
@@ -89,30 +225,33 @@ class MasterOrchestrator:
         """Marketing Branch Handler"""
         print("📢 Marketing Branch: Creating success story...")
         # TODO: Trigger content generation agents
-        self.redis.publish('branch:marketing:task', json.dumps({
+        await self.redis.publish('branch:marketing:task', json.dumps({
             'task': 'create_success_story',
+            'event_id': data.get('event_id'),
             'data': data
         }))
         
     async def handle_governance(self, data):
         """Governance Branch Handler"""
         print("🏛️ Governance Branch: Updating DAO state...")
-        self.redis.publish('branch:governance:task', json.dumps({
+        await self.redis.publish('branch:governance:task', json.dumps({
             'task': 'update_dao_state',
+            'event_id': data.get('event_id'),
             'data': data
         }))
         
     async def handle_wealth(self, data):
         """Wealth Management Branch Handler"""
         print("💰 Wealth Branch: Updating portfolio...")
-        self.redis.publish('branch:wealth:task', json.dumps({
+        await self.redis.publish('branch:wealth:task', json.dumps({
             'task': 'portfolio_update',
+            'event_id': data.get('event_id'),
             'data': data
         }))
     
     def get_stats(self):
         """Return orchestrator statistics"""
-        return self.stats
+        return dict(self.stats, dedup=dedup_stats())
 
 async def main():
     print("🌳 ====================================")
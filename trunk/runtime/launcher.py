@@ -0,0 +1,217 @@
+"""
+TREE RUNTIME LAUNCHER
+Hosts the orchestrator and branch agents in one process, or spreads them
+over a supervised pool of worker processes
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+# name -> (module, class). Modules are imported only when a component is
+# actually hosted, so a worker never pays for agents it does not run.
+COMPONENTS = {
+    'orchestrator': ('trunk.orchestrator.main', 'MasterOrchestrator'),
+    'verification': ('branches.verification.verify_agent', 'VerificationAgent'),
+    'marketing': ('branches.marketing.content_agent', 'MarketingAgent'),
+    'governance': ('branches.governance.dao_agent', 'GovernanceAgent'),
+    'wealth': ('branches.wealth.trading_agent', 'WealthAgent'),
+}
+
+
+def load_component(name):
+    """Import and construct a component by name"""
+    module_name, class_name = COMPONENTS[name]
+    module = importlib.import_module(module_name)
+    return getattr(module, class_name)()
+
+
+async def keep_running(name, start, max_backoff=30):
+    """
+    Run ``start()`` forever, restarting it with backoff whenever it fails,
+    so one component losing its connection never takes down the others
+    hosted on the same loop
+    """
+    loop = asyncio.get_running_loop()
+    backoff = 1
+    while True:
+        started = loop.time()
+        try:
+            await start()
+            print(f"❌ {name} stopped, restarting in {backoff}s")
+        except Exception as e:
+            print(f"❌ {name} failed: {e!r}, restarting in {backoff}s")
+        # Same rule as the process supervisor: a stable run resets the delay
+        if loop.time() - started > max_backoff:
+            backoff = 1
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
+
+async def serve_agent(agent):
+    """Drive a branch agent from an async subscription instead of its blocking listen()"""
+    from roots.databases.connections import get_async_redis
+
+    pubsub = get_async_redis(blocking_reads=True).pubsub()
+    try:
+        await pubsub.subscribe(agent.channel)
+        print(f"🌿 {type(agent).__name__}: Listening on {agent.channel}")
+
+        if hasattr(agent, 'handle_batch'):
+            await run_batches(agent, pubsub)
+            return
+
+        async for message in pubsub.listen():
+            if message['type'] != 'message':
+                continue
+            try:
+                task = json.loads(message['data'])
+                # Handlers are synchronous; keep them off the shared event loop
+                await asyncio.to_thread(agent.handle_task, task)
+            except Exception as e:
+                print(f"❌ {type(agent).__name__} task error: {e}")
+    finally:
+        await pubsub.aclose()
+
+
+async def run_agent(agent):
+    """Serve an agent, resubscribing with backoff after a lost connection"""
+    await keep_running(type(agent).__name__, lambda: serve_agent(agent))
+
+
+async def run_batches(agent, pubsub):
+    """Feed an agent micro-batches: wait for one task, then take whatever else arrives within its window"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = []
+        deadline = None
+        while len(batch) < agent.batch_size:
+            timeout = None if deadline is None else deadline - loop.time()
+            if timeout is not None and timeout <= 0:
+                break
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+            if message is None:
+                if deadline is None:
+                    continue
+                break
+            # One bad publish must not take the whole subscription down
+            try:
+                task = json.loads(message['data'])
+            except ValueError:
+                task = None
+            if not isinstance(task, dict):
+                print(f"⚠️ {type(agent).__name__} skipped malformed task: {message['data'][:200]!r}")
+                continue
+            batch.append(task)
+            if deadline is None:
+                deadline = loop.time() + agent.batch_window
+        try:
+            await asyncio.to_thread(agent.handle_batch, batch)
+        except Exception as e:
+            print(f"❌ {type(agent).__name__} batch error: {e}")
+
+
+async def run_components(names: List[str]):
+    """Host every named component as a task on the current event loop"""
+    tasks = []
+    for name in names:
+        component = load_component(name)
+        if name == 'orchestrator':
+            coroutine = keep_running(name, component.read_context_stream)
+        else:
+            coroutine = run_agent(component)
+        tasks.append(asyncio.create_task(coroutine, name=name))
+
+    print(f"🌳 Hosting {', '.join(names)} in process {os.getpid()}")
+    await asyncio.gather(*tasks)
+
+
+def _worker(names):
+    asyncio.run(run_components(names))
+
+
+def partition(names: List[str], workers: int) -> List[List[str]]:
+    """Deal components round-robin across workers"""
+    workers = max(1, min(workers, len(names)))
+    groups: List[List[str]] = [[] for _ in range(workers)]
+    for i, name in enumerate(names):
+        groups[i % workers].append(name)
+    return groups
+
+
+def supervise(names: List[str], workers: int, max_backoff=30):
+    """Run components over a pool of worker processes, restarting any that die"""
+    groups = partition(names, workers)
+    procs: Dict[int, multiprocessing.Process] = {}
+    backoff = {i: 1 for i in range(len(groups))}
+    restart_at = {i: 0.0 for i in range(len(groups))}
+    started_at = {i: 0.0 for i in range(len(groups))}
+
+    def start(i):
+        proc = multiprocessing.Process(target=_worker, args=(groups[i],), name=f"tree-worker-{i}")
+        proc.start()
+        procs[i] = proc
+        started_at[i] = time.monotonic()
+        print(f"🌱 Worker {i} (pid {proc.pid}): {', '.join(groups[i])}")
+
+    for i in range(len(groups)):
+        start(i)
+
+    try:
+        while True:
+            now = time.monotonic()
+            for i, proc in procs.items():
+                if proc.is_alive():
+                    # A worker that outlived the longest backoff is stable;
+                    # its next crash starts over from a short delay
+                    if now - started_at[i] > max_backoff:
+                        backoff[i] = 1
+                    continue
+                if restart_at[i] == 0.0:
+                    print(f"❌ Worker {i} exited with code {proc.exitcode}, restarting in {backoff[i]}s")
+                    restart_at[i] = now + backoff[i]
+                    backoff[i] = min(backoff[i] * 2, max_backoff)
+                elif now >= restart_at[i]:
+                    restart_at[i] = 0.0
+                    start(i)
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("🛑 Stopping workers...")
+        for proc in procs.values():
+            proc.terminate()
+        for proc in procs.values():
+            proc.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Tree components in one process or a supervised pool")
+    parser.add_argument(
+        'components', nargs='*', default=list(COMPONENTS),
+        help=f"components to host (default: all of {', '.join(COMPONENTS)})"
+    )
+    parser.add_argument(
+        '--workers', type=int, default=int(os.getenv('TREE_WORKERS', 1)),
+        help="worker processes; 1 hosts everything in this process, 0 sizes the pool to the core count"
+    )
+    args = parser.parse_args()
+
+    unknown = [name for name in args.components if name not in COMPONENTS]
+    if unknown:
+        parser.error(f"unknown components: {', '.join(unknown)}")
+
+    workers = args.workers or os.cpu_count() or 1
+    if workers == 1:
+        asyncio.run(run_components(args.components))
+    else:
+        supervise(args.components, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+HOT-PATH PROFILING
+Opt-in timing, sampled stacks and allocation tracking for the orchestrator
+and branch agents, switchable per process at runtime
+"""
+import functools
+import inspect
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, List, Optional
+
+MODES = ('timing', 'stacks', 'alloc')
+
+CONTROL_CHANNEL = 'profiling:control'
+CONFIG_KEY = 'profiling:config'
+REPORTS_KEY = 'profiling:reports'
+STACKS_KEY = 'profiling:stacks'
+
+# Reports of processes that stopped exporting age out with the hashes
+REPORT_TTL = 600
+
+
+def parse_modes(value) -> List[str]:
+    """'timing,stacks', 'all', '1' or a list -> known mode names"""
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(',')]
+    modes = []
+    for mode in value or ():
+        if mode in ('all', '1', 'true'):
+            return list(MODES)
+        if mode in MODES and mode not in modes:
+            modes.append(mode)
+    return modes
+
+
+def is_hot_path(name: str) -> bool:
+    return name == 'process_event' or name.startswith('handle_')
+
+
+def collapse(frame) -> str:
+    """One stack in folded form: root;...;leaf, as flamegraph.pl reads it"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """Counts every application thread's stack at a fixed interval"""
+
+    def __init__(self, interval: float, stacks: Counter):
+        super().__init__(name='profiling-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = stacks
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, str(ident))
+                if not name.startswith('profiling-'):
+                    self.stacks[f"{name};{collapse(frame)}"] += 1
+
+    def stop(self):
+        self.stopped.set()
+
+
+class Profiler:
+    """
+    Per-process profiling state shared by every component hosted in it.
+
+    While timing or allocation tracking is on, each hot-path method
+    (``process_event`` and ``handle_*``) of an attached component is
+    shadowed by a measuring wrapper stored on the instance. Turning them
+    off deletes the wrappers again, so a disabled profiler leaves the
+    original bound methods in place and costs nothing per call. Callers
+    must therefore look handlers up on the instance at call time rather
+    than keep references to bound methods.
+
+    Allocation figures come from tracemalloc's process-wide counters, so
+    handlers running concurrently in other threads or tasks bleed into
+    each other's numbers; treat them as a guide to where memory goes, not
+    an exact ledger.
+    """
+
+    def __init__(self):
+        self.components: List = []
+        self.modes: List[str] = []
+        self.sample_interval = float(os.getenv('PROFILING_SAMPLE_INTERVAL', 0.01))
+        self.export_interval = float(os.getenv('PROFILING_EXPORT_INTERVAL', 5))
+        self.process_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.handlers: Dict[str, Dict] = {}
+        self.stacks: Counter = Counter()
+        self.sampler: Optional[StackSampler] = None
+        self.lock = threading.Lock()
+        self.control: Optional[threading.Thread] = None
+
+    # --- instrumentation ---------------------------------------------------
+
+    def _wrap(self, label: str, method):
+        profiler = self
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def wrapper(*args, **kwargs):
+                started, allocated = profiler._enter()
+                try:
+                    return await method(*args, **kwargs)
+                finally:
+                    profiler._exit(label, started, allocated)
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                started, allocated = profiler._enter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    profiler._exit(label, started, allocated)
+        return wrapper
+
+    def _enter(self):
+        allocated = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        return time.perf_counter_ns(), allocated
+
+    def _exit(self, label: str, started: int, allocated: Optional[int]):
+        elapsed = time.perf_counter_ns() - started
+        retained = None
+        if allocated is not None and tracemalloc.is_tracing():
+            retained = tracemalloc.get_traced_memory()[0] - allocated
+        with self.lock:
+            stats = self.handlers.setdefault(label, {
+                'calls': 0, 'total_ns': 0, 'max_ns': 0,
+                'alloc_calls': 0, 'alloc_bytes': 0, 'alloc_max_bytes': 0,
+            })
+            stats['calls'] += 1
+            stats['total_ns'] += elapsed
+            stats['max_ns'] = max(stats['max_ns'], elapsed)
+            if retained is not None:
+                stats['alloc_calls'] += 1
+                stats['alloc_bytes'] += retained
+                stats['alloc_max_bytes'] = max(stats['alloc_max_bytes'], retained)
+
+    def _instrument(self, component):
+        for name, method in inspect.getmembers(type(component), callable):
+            if is_hot_path(name) and name not in vars(component):
+                label = f"{type(component).__name__}.{name}"
+                setattr(component, name, self._wrap(label, method.__get__(component)))
+
+    def _uninstrument(self, component):
+        for name in [name for name in vars(component) if is_hot_path(name)]:
+            delattr(component, name)
+
+    def attach(self, component):
+        """Register a component; starts listening for runtime control"""
+        if not self.components:
+            # Processes that never host a component (the API) stay untouched
+            self.configure(os.getenv('TREE_PROFILING', ''))
+        self.components.append(component)
+        if 'timing' in self.modes or 'alloc' in self.modes:
+            self._instrument(component)
+        self.start_control()
+
+    # --- switching ---------------------------------------------------------
+
+    def configure(self, modes, sample_interval=None):
+        """Switch this process to ``modes``; an empty list turns profiling off"""
+        modes = parse_modes(modes)
+        if sample_interval:
+            self.sample_interval = float(sample_interval)
+        wrapped = 'timing' in self.modes or 'alloc' in self.modes
+        wrapping = 'timing' in modes or 'alloc' in modes
+
+        if 'alloc' in modes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif 'alloc' not in modes and 'alloc' in self.modes:
+            tracemalloc.stop()
+
+        if wrapping and not wrapped:
+            for component in self.components:
+                self._instrument(component)
+        elif wrapped and not wrapping:
+            for component in self.components:
+                self._uninstrument(component)
+
+        # Samples are kept after the sampler stops so a flamegraph can still
+        # be pulled once profiling is switched off
+        if self.sampler is not None and ('stacks' not in modes or sample_interval):
+            self.sampler.stop()
+            self.sampler = None
+        if 'stacks' in modes and self.sampler is None:
+            self.sampler = StackSampler(self.sample_interval, self.stacks)
+            self.sampler.start()
+
+        if modes != self.modes:
+            print(f"🔬 Profiling {', '.join(modes) if modes else 'off'} in process {os.getpid()}")
+        self.modes = modes
+
+    def reset(self):
+        with self.lock:
+            self.handlers = {}
+        self.stacks.clear()
+
+    # --- reporting ---------------------------------------------------------
+
+    def report(self) -> Dict:
+        with self.lock:
+            handlers = {label: dict(stats) for label, stats in self.handlers.items()}
+        for stats in handlers.values():
+            stats['mean_ms'] = stats['total_ns'] / stats['calls'] / 1e6
+            stats['max_ms'] = stats.pop('max_ns') / 1e6
+            stats['total_ms'] = stats.pop('total_ns') / 1e6
+        return {
+            'process': self.process_id,
+            'components': [type(component).__name__ for component in self.components],
+            'modes': self.modes,
+            'sample_interval': self.sample_interval,
+            'exported_at': time.time(),
+            'handlers': handlers,
+        }
+
+    def collapsed_stacks(self) -> str:
+        """Sampled stacks in folded format, one 'stack count' per line"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.stacks.copy().items())
+
+    def export(self, client):
+        pipe = client.pipeline(transaction=False)
+        pipe.hset(REPORTS_KEY, self.process_id, json.dumps(self.report()))
+        pipe.hset(STACKS_KEY, self.process_id, self.collapsed_stacks())
+        pipe.expire(REPORTS_KEY, REPORT_TTL)
+        pipe.expire(STACKS_KEY, REPORT_TTL)
+        pipe.execute()
+
+    # --- runtime control ---------------------------------------------------
+
+    def apply(self, message: Dict):
+        if message.get('reset'):
+            self.reset()
+        if 'modes' in message:
+            self.configure(message['modes'], message.get('sample_interval'))
+
+    def start_control(self):
+        if self.control is None:
+            self.control = threading.Thread(target=self._control_loop, name='profiling-control', daemon=True)
+            self.control.start()
+
+    def _control_loop(self):
+        """Follow the admin control channel and export reports while profiling"""
+        from roots.databases.connections import get_pubsub, get_redis
+
+        while True:
+            pubsub = None
+            try:
+                client = get_redis()
+                pubsub = get_pubsub(CONTROL_CHANNEL)
+                # Pick up a runtime switch made before this process started
+                config = client.get(CONFIG_KEY)
+                if config:
+                    self.apply(json.loads(config))
+                while True:
+                    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=self.export_interval)
+                    if message is not None:
+                        self.apply(json.loads(message['data']))
+                    if self.modes or message is not None:
+                        self.export(client)
+            except Exception as e:
+                print(f"❌ Profiling control error: {e}")
+                time.sleep(5)
+            finally:
+                # Hand the connection back to the shared pub/sub pool
+                if pubsub is not None:
+                    pubsub.close()
+
+
+profiler = Profiler()
+
+
+def attach(component):
+    """Put a component's hot paths under the process profiler"""
+    profiler.attach(component)
+    return component